@@ -1,7 +1,9 @@
 import numpy as np
 from scipy.integrate import solve_ivp
 import matplotlib.pyplot as plt
-from typing import List, Tuple
+from typing import List, Tuple, Union
+
+from cliodynamics.system.solution import DenseSolution
 
 
 class DynamicalSystem:
@@ -21,7 +23,7 @@ class DynamicalSystem:
     -------
     system_equations(t, y)
         Defines the system's differential equations; must be implemented by subclasses.
-    solve(method='RK45')
+    solve(method='RK45', dense_output=False)
         Solves the system using the specified SciPy ODE solver.
     """
 
@@ -39,7 +41,9 @@ class DynamicalSystem:
         """Defines the system's differential equations. To be overridden by subclasses."""
         raise NotImplementedError("Subclasses should implement this method.")
 
-    def solve(self, method: str = "RK45") -> solve_ivp:
+    def solve(
+        self, method: str = "RK45", dense_output: bool = False
+    ) -> Union[solve_ivp, DenseSolution]:
         """
         Solves the system using a specified SciPy ODE solver.
 
@@ -47,10 +51,13 @@ class DynamicalSystem:
         ----------
         method : str, optional
             The integration method to use (default is 'RK45').
+        dense_output : bool, optional
+            If True, return a `DenseSolution` that can be evaluated on any time array
+            within ``time_span`` without re-integrating (default is False).
 
         Returns
         -------
-        solution : solve_ivp
+        solution : solve_ivp or DenseSolution
             The solution to the differential equations.
         """
         solution = solve_ivp(
@@ -59,5 +66,10 @@ class DynamicalSystem:
             self.initial_conditions,
             t_eval=self.time_points,
             method=method,
+            dense_output=dense_output,
         )
+        if dense_output:
+            if not solution.success:
+                raise RuntimeError(f"Integration failed: {solution.message}")
+            return DenseSolution(solution.sol, solution.t, solution.y)
         return solution
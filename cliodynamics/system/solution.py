@@ -0,0 +1,91 @@
+from scipy.integrate import OdeSolution
+
+from typing import Sequence
+import pickle
+
+import numpy as np
+
+
+class DenseSolution:
+    """
+    Continuous solution of a `DynamicalSystem`, built on `solve_ivp`'s dense output.
+
+    The interpolants produced by the solver are kept instead of values on a fixed
+    grid, so the trajectory can be evaluated on any time array inside the
+    integration span for the cost of an interpolation rather than a new solve.
+
+    Attributes
+    ----------
+    t : numpy.ndarray
+        The model's original ``time_points``.
+    y : numpy.ndarray
+        Solution at ``t``, shape ``(n_variables, len(t))``, as in ``solve_ivp``.
+    t_min, t_max : float
+        Bounds of the interval on which the solution can be evaluated.
+
+    Methods
+    -------
+    __call__(t)
+        Evaluates the solution at ``t``.
+    save(path)
+        Writes the solution to disk.
+    load(path)
+        Reads a solution written by `save`.
+    evaluate_ensemble(solutions, t)
+        Evaluates several solutions on a shared time array.
+    """
+
+    def __init__(self, sol: OdeSolution, t: np.ndarray, y: np.ndarray):
+        self.sol = sol
+        self.t = t
+        self.y = y
+        self.t_min = sol.t_min
+        self.t_max = sol.t_max
+
+    def __call__(self, t) -> np.ndarray:
+        """
+        Evaluates the solution at ``t``.
+
+        Parameters
+        ----------
+        t : float or array_like
+            Time(s) inside ``[t_min, t_max]``.
+
+        Returns
+        -------
+        numpy.ndarray
+            Shape ``(n_variables,)`` for scalar ``t``, else ``(n_variables, len(t))``.
+        """
+        t = np.asarray(t, dtype=float)
+        if np.any(t < self.t_min) or np.any(t > self.t_max):
+            raise ValueError(
+                f"Solution is only defined on [{self.t_min}, {self.t_max}]."
+            )
+        return self.sol(t)
+
+    def save(self, path: str):
+        """Pickles the solution to ``path``."""
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "DenseSolution":
+        """Loads a solution written by `save`. Only load files you trust."""
+        with open(path, "rb") as f:
+            solution = pickle.load(f)
+        if not isinstance(solution, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}.")
+        return solution
+
+    @staticmethod
+    def evaluate_ensemble(solutions: Sequence["DenseSolution"], t) -> np.ndarray:
+        """
+        Evaluates every member of an ensemble on the same time array.
+
+        Returns
+        -------
+        numpy.ndarray
+            Shape ``(len(solutions), n_variables, len(t))``.
+        """
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        return np.stack([solution(t) for solution in solutions])
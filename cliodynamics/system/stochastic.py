@@ -0,0 +1,258 @@
+from cliodynamics.system.base import DynamicalSystem
+
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+import copy
+
+import numpy as np
+
+
+class StochasticSystem:
+    """
+    Stochastic-dynamics engine for ensembles of a `DynamicalSystem` driven by noise.
+
+    Integrates the Itô SDE
+
+        dy = f(t, y) dt + g(t, y) dW
+
+    where the drift ``f`` is the model's own ``system_equations`` and ``g`` is a
+    diagonal diffusion term (one independent Wiener process per state variable).
+    All ensemble members are stepped together as arrays of shape
+    ``(n_variables, n_paths)``, which works unchanged with models such as `SDTModel`
+    and `RetrospectiveSDTModel` whose equations are plain arithmetic on the unpacked
+    state. Model rates may likewise be given one value per path through
+    ``parameters`` to combine parameter uncertainty with path noise.
+
+    Paths are produced in chunks, but their noise is tied to fixed blocks of
+    `PATH_BLOCK` paths: block ``b`` draws from a counter-based Philox generator keyed
+    by ``(seed, b)``. Path ``i`` therefore sees the same noise for a given ``seed``
+    whatever the ``chunk_size``, and any chunk can be regenerated on its own.
+
+    Attributes
+    ----------
+    model : DynamicalSystem
+        The deterministic model supplying the drift, initial conditions, time span
+        and output time points.
+    diffusion : sequence of float or callable
+        Noise amplitudes, one per state variable, or a function ``g(t, y)``
+        returning an array shaped like ``y``.
+    noise : {'multiplicative', 'additive'}
+        How amplitudes are turned into a diffusion term: ``sigma * y`` (relative
+        shocks, the natural choice for populations) or the constant ``sigma``.
+        Ignored when ``diffusion`` is callable.
+    diffusion_derivative : callable, optional
+        ``dg_i/dy_i`` for a callable ``diffusion``; required only by the Milstein
+        scheme.
+    parameters : dict of str to numpy.ndarray or float, optional
+        Per-path values of model attributes (e.g. ``{"birth_rate": rates}``), each
+        of length ``n_paths``. Scalars apply to every path.
+
+    Methods
+    -------
+    simulate(n_paths, dt, method='euler-maruyama', seed=0, chunk_size=10000)
+        Yields the ensemble chunk by chunk.
+    solve(n_paths, dt, method='euler-maruyama', seed=0, chunk_size=10000)
+        Returns the whole ensemble as one array.
+    """
+
+    METHODS = ("euler-maruyama", "milstein")
+    PATH_BLOCK = 1000
+
+    def __init__(
+        self,
+        model: DynamicalSystem,
+        diffusion: Union[Sequence[float], Callable[[float, np.ndarray], np.ndarray]],
+        noise: str = "multiplicative",
+        diffusion_derivative: Optional[
+            Callable[[float, np.ndarray], np.ndarray]
+        ] = None,
+        parameters: Optional[Dict[str, Union[float, np.ndarray]]] = None,
+    ):
+        if noise not in ("multiplicative", "additive"):
+            raise ValueError("noise must be 'multiplicative' or 'additive'.")
+        self.model = model
+        self.diffusion = diffusion
+        self.noise = noise
+        self.diffusion_derivative = diffusion_derivative
+        self.parameters = {
+            name: np.asarray(values) for name, values in (parameters or {}).items()
+        }
+
+    def simulate(
+        self,
+        n_paths: int,
+        dt: float,
+        method: str = "euler-maruyama",
+        seed: int = 0,
+        chunk_size: int = 10_000,
+        initial_conditions: Optional[np.ndarray] = None,
+    ) -> Iterator[Tuple[slice, np.ndarray]]:
+        """
+        Integrates ``n_paths`` noisy trajectories, ``chunk_size`` paths at a time.
+
+        Parameters
+        ----------
+        n_paths : int
+            Number of ensemble members.
+        dt : float
+            Maximum integration step. Each interval between consecutive output times
+            is split into equal steps no longer than ``dt``.
+        method : {'euler-maruyama', 'milstein'}
+            Integration scheme. Milstein adds the ``0.5 g g' (dW^2 - dt)`` correction
+            and has strong order 1 rather than 1/2.
+        seed : int
+            Key of the counter-based random number generator.
+        chunk_size : int
+            Number of paths integrated (and held in memory) at once. Does not affect
+            the result; multiples of `PATH_BLOCK` avoid redrawing shared blocks.
+        initial_conditions : numpy.ndarray, optional
+            Shape ``(n_variables,)`` or ``(n_variables, n_paths)``. Defaults to the
+            model's initial conditions for every path.
+
+        Yields
+        ------
+        paths : slice
+            The ensemble members contained in this chunk.
+        y : numpy.ndarray
+            Their trajectories, shape ``(len(paths), n_variables, len(time_points))``
+            following the ``solve_ivp`` layout per path.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method '{method}'. Choose from {self.METHODS}.")
+        if (
+            method == "milstein"
+            and callable(self.diffusion)
+            and self.diffusion_derivative is None
+        ):
+            raise ValueError("The Milstein scheme needs a diffusion_derivative.")
+        parameters = {}
+        for name, values in self.parameters.items():
+            try:
+                parameters[name] = np.broadcast_to(values, (n_paths,))
+            except ValueError:
+                raise ValueError(
+                    f"Parameter '{name}' must be a scalar or have {n_paths} values."
+                ) from None
+
+        if initial_conditions is None:
+            initial_conditions = self.model.initial_conditions
+        y0 = np.asarray(initial_conditions, dtype=float)
+        if y0.ndim == 1:
+            y0 = np.broadcast_to(y0[:, None], (len(y0), n_paths))
+        steps = self._step_schedule(dt)
+
+        for start in range(0, n_paths, chunk_size):
+            paths = slice(start, min(start + chunk_size, n_paths))
+            model = copy.copy(self.model)
+            for name, values in parameters.items():
+                setattr(model, name, values[paths])
+            y = np.array(y0[:, paths])
+            noise = self._noise(paths, len(y), seed)
+            yield paths, self._integrate(model, y, steps, method, noise)
+
+    def solve(
+        self,
+        n_paths: int,
+        dt: float,
+        method: str = "euler-maruyama",
+        seed: int = 0,
+        chunk_size: int = 10_000,
+        initial_conditions: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Integrates the full ensemble. See `simulate` for the parameters.
+
+        Returns
+        -------
+        time_points : numpy.ndarray
+            The model's output times.
+        y : numpy.ndarray
+            Trajectories of shape ``(n_paths, n_variables, len(time_points))``.
+        """
+        time_points = np.asarray(self.model.time_points, dtype=float)
+        y = np.empty((n_paths, len(self.model.initial_conditions), len(time_points)))
+        for paths, chunk in self.simulate(
+            n_paths, dt, method, seed, chunk_size, initial_conditions
+        ):
+            y[paths] = chunk
+        return time_points, y
+
+    def _step_schedule(self, dt: float) -> list:
+        """Returns ``(n_steps, h)`` for each interval ending at an output time."""
+        t0 = self.model.time_span[0]
+        schedule = []
+        for t in np.asarray(self.model.time_points, dtype=float):
+            n_steps = int(np.ceil((t - t0) / dt - 1e-9))
+            schedule.append((n_steps, (t - t0) / n_steps if n_steps else 0.0))
+            t0 = t
+        return schedule
+
+    def _noise(
+        self, paths: slice, n_variables: int, seed: int
+    ) -> Callable[[np.ndarray], None]:
+        """
+        Returns a function filling ``dW`` of shape ``(n_variables, len(paths))`` with
+        the next standard normal draws of those paths.
+
+        Each step, every block overlapping ``paths`` draws ``(n_variables,
+        PATH_BLOCK)`` values from its own generator and the columns of the
+        requested paths are copied out.
+        """
+        size = self.PATH_BLOCK
+        blocks = range(paths.start // size, (paths.stop - 1) // size + 1)
+        rngs = [
+            np.random.Generator(np.random.Philox(key=(block << 64) + seed))
+            for block in blocks
+        ]
+        buffer = np.empty((n_variables, size))
+
+        def draw(dW: np.ndarray):
+            for block, rng in zip(blocks, rngs):
+                rng.standard_normal(out=buffer)
+                lo = max(paths.start, block * size)
+                hi = min(paths.stop, (block + 1) * size)
+                dW[:, lo - paths.start : hi - paths.start] = buffer[
+                    :, lo - block * size : hi - block * size
+                ]
+
+        return draw
+
+    def _diffusion(self, t: float, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the diffusion term and its diagonal derivative ``dg_i/dy_i``."""
+        if callable(self.diffusion):
+            g = np.asarray(self.diffusion(t, y), dtype=float)
+            dg = (
+                np.asarray(self.diffusion_derivative(t, y), dtype=float)
+                if self.diffusion_derivative is not None
+                else None
+            )
+            return g, dg
+        sigma = np.asarray(self.diffusion, dtype=float)[:, None]
+        if self.noise == "multiplicative":
+            return sigma * y, sigma
+        return np.broadcast_to(sigma, y.shape), np.zeros_like(sigma)
+
+    def _integrate(
+        self,
+        model: DynamicalSystem,
+        y: np.ndarray,
+        steps: list,
+        method: str,
+        noise: Callable[[np.ndarray], None],
+    ) -> np.ndarray:
+        out = np.empty((y.shape[1], y.shape[0], len(steps)))
+        dW = np.empty_like(y)
+        t = model.time_span[0]
+        for k, (n_steps, h) in enumerate(steps):
+            sqrt_h = np.sqrt(h)
+            for _ in range(n_steps):
+                drift = np.array(np.broadcast_arrays(*model.system_equations(t, y)))
+                g, dg = self._diffusion(t, y)
+                noise(dW)
+                dW *= sqrt_h
+                y_next = y + drift * h + g * dW
+                if method == "milstein":
+                    y_next += 0.5 * g * dg * (dW * dW - h)
+                y = y_next
+                t += h
+            out[:, :, k] = y.T
+        return out
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from cliodynamics.system.base import DynamicalSystem
+from cliodynamics.system.sdt import SDTModel
+from cliodynamics.system.solution import DenseSolution
+
+
+def make_model(time_points=None, **rates) -> SDTModel:
+    parameters = dict(
+        birth_rate=0.3,
+        death_rate=0.1,
+        elite_growth_rate=0.05,
+        resource_depletion_rate=0.02,
+        resource_replenish_rate=0.03,
+    )
+    parameters.update(rates)
+    return SDTModel(
+        initial_conditions=[0.5, 1.0, 0.1],
+        time_span=(0.0, 10.0),
+        time_points=(
+            np.linspace(0.0, 10.0, 11) if time_points is None else time_points
+        ),
+        **parameters,
+    )
+
+
+class BlowUp(DynamicalSystem):
+    """dy/dt = y^2, which diverges at t = 1 for y(0) = 1."""
+
+    def system_equations(self, t, y):
+        return [y[0] ** 2]
+
+
+class TestDenseSolution(unittest.TestCase):
+    def test_resampling_matches_fresh_solve(self):
+        solution = make_model().solve(dense_output=True)
+        self.assertIsInstance(solution, DenseSolution)
+        np.testing.assert_array_equal(solution.t, np.linspace(0.0, 10.0, 11))
+
+        fine = np.linspace(0.0, 10.0, 101)
+        expected = make_model(time_points=fine).solve().y
+        np.testing.assert_allclose(solution(fine), expected, rtol=1e-10, atol=1e-12)
+
+    def test_save_and_load(self):
+        solution = make_model().solve(dense_output=True)
+        fd, path = tempfile.mkstemp(suffix=".pkl")
+        os.close(fd)
+        try:
+            solution.save(path)
+            loaded = DenseSolution.load(path)
+        finally:
+            os.remove(path)
+
+        t = np.linspace(0.0, 10.0, 37)
+        np.testing.assert_array_equal(loaded(t), solution(t))
+        np.testing.assert_array_equal(loaded.y, solution.y)
+        self.assertEqual((loaded.t_min, loaded.t_max), (0.0, 10.0))
+
+    def test_outside_interval_raises(self):
+        solution = make_model().solve(dense_output=True)
+        with self.assertRaises(ValueError):
+            solution(-0.1)
+        with self.assertRaises(ValueError):
+            solution([5.0, 10.5])
+
+    def test_scalar_and_array_shapes(self):
+        solution = make_model().solve(dense_output=True)
+        self.assertEqual(solution(2.5).shape, (3,))
+        self.assertEqual(solution([2.5]).shape, (3, 1))
+        self.assertEqual(solution(np.linspace(0.0, 10.0, 7)).shape, (3, 7))
+        np.testing.assert_allclose(solution(2.5), solution([2.5])[:, 0])
+
+    def test_evaluate_ensemble_shape(self):
+        solutions = [
+            make_model(birth_rate=rate).solve(dense_output=True)
+            for rate in (0.2, 0.3, 0.4, 0.5)
+        ]
+        t = np.linspace(0.0, 10.0, 25)
+        ensemble = DenseSolution.evaluate_ensemble(solutions, t)
+
+        self.assertEqual(ensemble.shape, (4, 3, 25))
+        np.testing.assert_array_equal(ensemble[2], solutions[2](t))
+        self.assertEqual(
+            DenseSolution.evaluate_ensemble(solutions, 1.0).shape, (4, 3, 1)
+        )
+
+    def test_failed_integration_raises(self):
+        model = BlowUp([1.0], (0.0, 2.0), np.linspace(0.0, 2.0, 5))
+        with self.assertRaises(RuntimeError):
+            model.solve(dense_output=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
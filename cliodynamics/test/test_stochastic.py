@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from cliodynamics.system.sdt import SDTModel
+from cliodynamics.system.stochastic import StochasticSystem
+
+
+def make_model(**rates) -> SDTModel:
+    parameters = dict(
+        birth_rate=0.3,
+        death_rate=0.1,
+        elite_growth_rate=0.05,
+        resource_depletion_rate=0.02,
+        resource_replenish_rate=0.03,
+    )
+    parameters.update(rates)
+    return SDTModel(
+        initial_conditions=[0.5, 1.0, 0.1],
+        time_span=(0.0, 10.0),
+        time_points=np.linspace(0.0, 10.0, 11),
+        **parameters,
+    )
+
+
+class TestStochasticSystem(unittest.TestCase):
+    def test_zero_noise_matches_solve(self):
+        model = make_model()
+        system = StochasticSystem(model, diffusion=[0.0, 0.0, 0.0])
+        time_points, y = system.solve(n_paths=3, dt=1e-3)
+
+        expected = model.solve(method="DOP853").y
+        np.testing.assert_allclose(time_points, model.time_points)
+        for path in y:
+            np.testing.assert_allclose(path, expected, rtol=1e-2, atol=1e-3)
+
+    def test_same_seed_is_reproducible(self):
+        system = StochasticSystem(make_model(), diffusion=[0.1, 0.05, 0.1])
+        _, first = system.solve(n_paths=50, dt=0.01, seed=7)
+        _, again = system.solve(n_paths=50, dt=0.01, seed=7)
+        _, other = system.solve(n_paths=50, dt=0.01, seed=8)
+
+        np.testing.assert_array_equal(first, again)
+        self.assertFalse(np.allclose(first, other))
+
+    def test_paths_do_not_depend_on_chunk_size(self):
+        system = StochasticSystem(make_model(), diffusion=[0.1, 0.05, 0.1])
+        n_paths = StochasticSystem.PATH_BLOCK + 300
+        _, whole = system.solve(n_paths=n_paths, dt=0.1, seed=3)
+        _, chunked = system.solve(n_paths=n_paths, dt=0.1, seed=3, chunk_size=333)
+        _, fewer = system.solve(n_paths=5, dt=0.1, seed=3)
+
+        np.testing.assert_array_equal(whole, chunked)
+        np.testing.assert_array_equal(whole[:5], fewer)
+
+    def test_milstein_equals_euler_maruyama_for_additive_noise(self):
+        system = StochasticSystem(
+            make_model(), diffusion=[0.01, 0.01, 0.01], noise="additive"
+        )
+        _, euler = system.solve(n_paths=20, dt=0.01, seed=1)
+        _, milstein = system.solve(n_paths=20, dt=0.01, method="milstein", seed=1)
+
+        np.testing.assert_allclose(milstein, euler)
+
+    def test_per_path_parameters(self):
+        rates = np.array([0.2, 0.3, 0.4])
+        system = StochasticSystem(
+            make_model(),
+            diffusion=[0.0, 0.0, 0.0],
+            parameters={"birth_rate": rates, "death_rate": 0.05},
+        )
+        _, y = system.solve(n_paths=3, dt=1e-3)
+
+        for path, rate in zip(y, rates):
+            expected = make_model(birth_rate=rate, death_rate=0.05).solve().y
+            np.testing.assert_allclose(path, expected, rtol=1e-2, atol=1e-3)
+
+        with self.assertRaises(ValueError):
+            system.solve(n_paths=4, dt=1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()
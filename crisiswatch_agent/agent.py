@@ -1,6 +1,6 @@
 from smolagents import CodeAgent
 from typing import Literal
-from .tools.fetch import fetch_crisiswatch_data, init_db
+from .tools.fetch import prepopulate_from_urls, init_db
 from .tools.search import search_reports_rag
 from .tools.summarize import summarize_reports
 
@@ -32,11 +32,11 @@ def create_agent(
             name="CrisisWatchAgent",
             instructions=(
                 "You are a geopolitical analyst agent. "
-                "Use `fetch_crisiswatch_data` to load data, `search_reports_rag` to retrieve relevant info, "
+                "Use `prepopulate_from_urls` to load data, `search_reports_rag` to retrieve relevant info, "
                 "and `summarize_reports` to give users a regional trend summary."
             ),
             model=backend,
-            tools=[fetch_crisiswatch_data, search_reports_rag, summarize_reports],
+            tools=[prepopulate_from_urls, search_reports_rag, summarize_reports],
         )
     else:
         backend = None
@@ -45,9 +45,9 @@ def create_agent(
             name="CrisisWatchAgent",
             instructions=(
                 "You are a geopolitical analyst agent. "
-                "Use `fetch_crisiswatch_data` to load data, `search_reports_rag` to retrieve relevant info, "
+                "Use `prepopulate_from_urls` to load data, `search_reports_rag` to retrieve relevant info, "
                 "and `summarize_reports` to give users a regional trend summary."
             ),
-            tools=[fetch_crisiswatch_data, search_reports_rag, summarize_reports],
+            tools=[prepopulate_from_urls, search_reports_rag, summarize_reports],
             backend=backend,
         )
@@ -0,0 +1,90 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into small batches and runs them on one worker thread.
+
+    The first request in an empty queue opens a window of ``max_wait`` seconds; every
+    request that arrives inside that window (up to ``max_batch_size``) is handed to
+    ``batch_fn`` in a single call. Because all batches run on the same thread,
+    ``batch_fn`` never executes concurrently with itself.
+
+    ``batch_fn`` may put an exception instance in place of a result to fail only that
+    request; an exception raised by ``batch_fn`` itself fails the whole batch.
+
+    Attributes
+    ----------
+    batch_fn : callable
+        Function mapping a list of request items to a list of results of the same length.
+    max_batch_size : int
+        Maximum number of items passed to ``batch_fn`` at once.
+    max_wait : float
+        Length of the batching window in seconds.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.01,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Any:
+        """Queues ``item`` and blocks until its result is available."""
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def close(self):
+        """Stops the worker thread after the pending requests have been served."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is self._STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is self._STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._run(batch)
+
+    def _run(self, batch: List[Tuple[Any, Future]]):
+        items = [item for item, _ in batch]
+        try:
+            results = self.batch_fn(items)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
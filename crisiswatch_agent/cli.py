@@ -1,5 +1,5 @@
 import argparse
-from crisiswatch_agent.agent import create_agent
+from crisiswatch_agent import client
 
 
 def main():
@@ -9,10 +9,70 @@ def main():
     )
     parser.add_argument("--query", type=str, help="One-off query to run with the agent")
     parser.add_argument("--model", choices=["openai", "smollm"], default="smollm")
+    parser.add_argument("--db-path", type=str, default="crisiswatch.db")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a long-lived server that keeps the models and index loaded",
+    )
+    parser.add_argument(
+        "--remote",
+        action="store_true",
+        help="Forward --query/--chat to a running server instead of loading models",
+    )
+    parser.add_argument("--host", type=str, default=client.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=client.DEFAULT_PORT)
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=0.01,
+        help="Seconds the server waits to group concurrent requests into a batch",
+    )
 
     args = parser.parse_args()
 
-    agent = create_agent(model=args.model)
+    if args.serve:
+        from crisiswatch_agent.server import serve
+
+        serve(
+            model=args.model,
+            db_path=args.db_path,
+            host=args.host,
+            port=args.port,
+            batch_window=args.batch_window,
+        )
+        return
+
+    if not (args.chat or args.query):
+        parser.print_help()
+        return
+
+    streamed = []
+
+    if args.remote:
+        if not client.ping(args.host, args.port):
+            parser.error(f"No CrisisWatch server at {args.host}:{args.port}")
+
+        def run(text):
+            return client.query(text, host=args.host, port=args.port)
+
+    else:
+        from crisiswatch_agent.agent import create_agent
+
+        agent = create_agent(model=args.model, db_path=args.db_path)
+        run = agent.run
+
+        if args.chat:
+            from crisiswatch_agent.tools.summarize import set_stream_handler
+
+            def show(text):
+                # Show summaries token by token while the agent is still working
+                if not streamed:
+                    print("Agent: ", end="")
+                streamed.append(text)
+                print(text, end="", flush=True)
+
+            set_stream_handler(show)
 
     if args.chat:
         print("\nInteractive Chat Mode (type 'exit' to quit)\n")
@@ -22,17 +82,19 @@ def main():
                 if user_input.strip().lower() in {"exit", "quit"}:
                     print("Goodbye!")
                     break
-                response = agent.run(user_input)
+                streamed.clear()
+                response = run(user_input)
+                if streamed:
+                    print("\n")
+                    if str(response).strip() == "".join(streamed).strip():
+                        continue
                 print(f"Agent: {response}\n")
             except (KeyboardInterrupt, EOFError):
                 print("\nSession ended.")
                 break
 
-    elif args.query:
-        print(agent.run(args.query))
-
     else:
-        parser.print_help()
+        print(run(args.query))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+import json
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def _request(
+    path: str,
+    payload: Optional[Dict[str, Any]] = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    timeout: float = 600.0,
+) -> Dict[str, Any]:
+    url = f"http://{host}:{port}{path}"
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(
+        url, data=data, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        body = json.loads(e.read() or b"{}")
+        raise RuntimeError(body.get("error", str(e))) from e
+
+
+def ping(
+    host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 1.0
+) -> bool:
+    """Returns True if a CrisisWatch server is answering on ``host:port``."""
+    try:
+        return (
+            _request("/health", host=host, port=port, timeout=timeout)["status"] == "ok"
+        )
+    except (OSError, ValueError, KeyError, RuntimeError):
+        return False
+
+
+def query(
+    text: str,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    timeout: float = 600.0,
+) -> str:
+    """Runs ``text`` through the agent resident in the server."""
+    return _request("/query", {"query": text}, host, port, timeout)["response"]
+
+
+def search(
+    text: str,
+    top_k: int = 5,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    timeout: float = 60.0,
+) -> Dict[str, list]:
+    """Retrieves the ``top_k`` most relevant reports from the server's resident index."""
+    return _request("/search", {"query": text, "top_k": top_k}, host, port, timeout)
@@ -1,55 +1,299 @@
+import argparse
+import os
 import sqlite3
+import time
 import numpy as np
+from typing import Dict, List, Optional, Union
 import faiss
-from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
 
-MODEL_NAME = "all-MiniLM-L6-v2"
-embedding_model = SentenceTransformer(MODEL_NAME)
+from .backends import MODEL_NAME, EmbeddingBackend, TorchBackend, get_backend
+from .store import STORE_DTYPES, EmbeddingStore
+
+embedding_backend = get_backend(
+    os.environ.get("CRISISWATCH_EMBEDDING_BACKEND", "torch")
+)
+
+
+def set_embedding_backend(backend: Union[str, EmbeddingBackend]) -> EmbeddingBackend:
+    """
+    Replaces the backend used by `embed_text` and `embed_texts`.
+
+    Parameters
+    ----------
+    backend : str or EmbeddingBackend
+        A loaded backend, or the name of one to load (see `backends.get_backend`).
+
+    Returns
+    -------
+    EmbeddingBackend
+        The backend now in use.
+    """
+    global embedding_backend
+    if isinstance(backend, str):
+        backend = get_backend(backend)
+    embedding_backend = backend
+    return embedding_backend
 
 
 def embed_text(text: str) -> np.ndarray:
-    return np.array(
-        embedding_model.encode(text, normalize_embeddings=True), dtype="float32"
-    )
+    return embedding_backend.encode([text])[0]
 
 
-def update_embeddings(db_path: str = "crisiswatch.db"):
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT id, text FROM reports
-        WHERE id NOT IN (SELECT report_id FROM embeddings)
+def embed_texts(texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """
+    Embeds several texts in a single forward pass per batch.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (len(texts), dim) with L2-normalized float32 rows.
+    """
+    return embedding_backend.encode(texts, batch_size=batch_size)
+
+
+def update_embeddings(db_path: str = "crisiswatch.db", batch_size: int = 64):
+    """
+    Embeds every report that is not yet in the database's `EmbeddingStore`.
+
+    Embeddings left in the legacy per-row ``embeddings`` BLOB table are imported
+    into the store the first time it is used. Only report ids are read up front;
+    texts are fetched ``batch_size`` at a time for the reports still missing.
     """
+    store = EmbeddingStore(db_path)
+    if len(store) == 0:
+        _import_blob_embeddings(store)
+
+    conn = sqlite3.connect(db_path)
+    report_ids = np.array(
+        [rid for (rid,) in conn.execute("SELECT id FROM reports")], dtype="int64"
     )
-    rows = cur.fetchall()
-    for rid, text in tqdm(rows, desc="embedding no."):
-        vec = embed_text(text)
-        print(vec)
-        cur.execute(
-            "INSERT INTO embeddings (report_id, embedding) VALUES (?, ?)",
-            (rid, vec.tobytes()),
+    missing = report_ids[~np.isin(report_ids, store.ids())].tolist()
+    if not missing:
+        conn.close()
+        return
+
+    for start in tqdm(range(0, len(missing), batch_size), desc="embedding batch"):
+        chunk = missing[start : start + batch_size]
+        rows = conn.execute(
+            f"SELECT id, text FROM reports WHERE id IN ({','.join('?' * len(chunk))})",
+            chunk,
+        ).fetchall()
+        store.append(
+            np.array([rid for rid, _ in rows], dtype="int64"),
+            embed_texts([text for _, text in rows], batch_size),
+            embedding_backend.model_name,
+            embedding_backend.name,
         )
-    conn.commit()
-    embs = cur.execute("SELECT * FROM embeddings;")
-    print(embs.fetchall())
     conn.close()
 
 
-def build_faiss_index(db_path: str = "crisiswatch.db") -> faiss.IndexFlatIP:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT report_id, embedding FROM embeddings")
-    rows = cur.fetchall()
+def _import_blob_embeddings(store: EmbeddingStore):
+    conn = sqlite3.connect(store.db_path)
+    try:
+        rows = conn.execute("SELECT report_id, embedding FROM embeddings").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
     conn.close()
+    if rows:
+        ids, vectors = zip(
+            *[(rid, np.frombuffer(blob, dtype="float32")) for rid, blob in rows]
+        )
+        store.write(np.array(ids), np.stack(vectors), MODEL_NAME, TorchBackend.name)
+
+
+def build_faiss_index(db_path: str = "crisiswatch.db", chunk_size: int = 4096):
+    """
+    Builds an inner-product FAISS index over the database's `EmbeddingStore`.
 
-    if not rows:
+    float32 stores get an exact `faiss.IndexFlatIP`. float16 and int8 stores get a
+    `faiss.IndexScalarQuantizer` with the matching ``QT_fp16``/``QT_8bit`` codes, so
+    the index keeps the store's memory footprint instead of expanding to float32.
+    Rows are dequantized and added ``chunk_size`` at a time.
+    """
+    snapshot = EmbeddingStore(db_path).snapshot()
+    if len(snapshot.ids) == 0:
         return faiss.IndexFlatIP(384)
 
-    ids, vectors = zip(
-        *[(rid, np.frombuffer(blob, dtype="float32")) for rid, blob in rows]
-    )
-    index = faiss.IndexIDMap(faiss.IndexFlatIP(len(vectors[0])))
-    index.add_with_ids(np.stack(vectors), np.array(ids))
+    dim = snapshot.vectors.shape[1]
+    dtype = snapshot.metadata["dtype"]
+    if dtype == "float32":
+        inner = faiss.IndexFlatIP(dim)
+    else:
+        qtype = {
+            "float16": faiss.ScalarQuantizer.QT_fp16,
+            "int8": faiss.ScalarQuantizer.QT_8bit,
+        }[dtype]
+        inner = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_INNER_PRODUCT)
+        if not inner.is_trained:
+            sample = np.linspace(
+                0, len(snapshot.ids) - 1, min(len(snapshot.ids), 65536)
+            ).astype(int)
+            inner.train(np.ascontiguousarray(snapshot.dequantize(sample)))
+
+    index = faiss.IndexIDMap(inner)
+    for start in range(0, len(snapshot.ids), chunk_size):
+        # A slice keeps float32 chunks as views of the memory map
+        rows = slice(start, start + chunk_size)
+        index.add_with_ids(
+            np.ascontiguousarray(snapshot.dequantize(rows)),
+            np.ascontiguousarray(snapshot.ids[rows]),
+        )
     return index
+
+
+def reembed_database(
+    db_path: str = "crisiswatch.db",
+    backend: Optional[Union[str, EmbeddingBackend]] = None,
+    batch_size: int = 64,
+    dtype: Optional[str] = None,
+) -> int:
+    """
+    Recomputes the embedding of every report with ``backend``.
+
+    Vectors from different backends are close but not identical, so the stored
+    embeddings should be regenerated whenever the query-time backend changes.
+
+    Parameters
+    ----------
+    db_path : str
+        Path to the SQLite database.
+    backend : str or EmbeddingBackend, optional
+        Backend to embed with. Defaults to the active backend.
+    batch_size : int
+        Number of reports encoded per forward pass.
+    dtype : {'float32', 'float16', 'int8'}, optional
+        Storage dtype for the rebuilt store. Defaults to the store's current dtype.
+
+    Returns
+    -------
+    int
+        The number of reports re-embedded.
+    """
+    if backend is None:
+        backend = embedding_backend
+    elif isinstance(backend, str):
+        backend = get_backend(backend)
+
+    store = EmbeddingStore(db_path)
+    if dtype is not None and dtype not in STORE_DTYPES:
+        raise ValueError(f"Unsupported store dtype '{dtype}'. Use {STORE_DTYPES}.")
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, text FROM reports").fetchall()
+    conn.close()
+
+    vectors = []
+    for start in tqdm(range(0, len(rows), batch_size), desc="re-embedding batch"):
+        chunk = rows[start : start + batch_size]
+        vectors.append(
+            backend.encode([text for _, text in chunk], batch_size=batch_size)
+        )
+    store.write(
+        np.array([rid for rid, _ in rows], dtype="int64"),
+        np.concatenate(vectors) if vectors else np.empty((0, 384), dtype="float32"),
+        backend.model_name,
+        backend.name,
+        dtype=dtype,
+    )
+    return len(rows)
+
+
+def compare_backends(
+    texts: List[str],
+    candidate: Union[str, EmbeddingBackend],
+    baseline: Union[str, EmbeddingBackend] = "torch",
+    batch_size: int = 32,
+) -> Dict[str, float]:
+    """
+    Measures how closely ``candidate`` reproduces ``baseline`` and how much faster it is.
+
+    Parameters
+    ----------
+    texts : list of str
+        Sample texts to embed with both backends.
+    candidate : str or EmbeddingBackend
+        The backend under evaluation, e.g. 'int8' or 'onnx'.
+    baseline : str or EmbeddingBackend
+        The reference backend (default is the float32 'torch' backend).
+    batch_size : int
+        Number of texts encoded per forward pass.
+
+    Returns
+    -------
+    dict
+        'mean_cosine' and 'min_cosine' between paired embeddings, the throughput of
+        each backend in texts per second, and the candidate's 'speedup'.
+    """
+    if isinstance(candidate, str):
+        candidate = get_backend(candidate)
+    if isinstance(baseline, str):
+        baseline = get_backend(baseline)
+
+    timings = {}
+    vectors = {}
+    for label, backend in (("baseline", baseline), ("candidate", candidate)):
+        backend.encode(texts[:1])  # warm-up
+        start = time.perf_counter()
+        vectors[label] = backend.encode(texts, batch_size=batch_size)
+        timings[label] = time.perf_counter() - start
+
+    cosines = np.sum(vectors["baseline"] * vectors["candidate"], axis=1)
+    return {
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "baseline_texts_per_s": len(texts) / timings["baseline"],
+        "candidate_texts_per_s": len(texts) / timings["candidate"],
+        "speedup": timings["baseline"] / timings["candidate"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CrisisWatch embedding maintenance")
+    parser.add_argument("--db-path", type=str, default="crisiswatch.db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reembed = subparsers.add_parser("reembed", help="Re-embed every stored report")
+    reembed.add_argument("backend", choices=["torch", "int8", "onnx"])
+    reembed.add_argument("--batch-size", type=int, default=64)
+    reembed.add_argument("--dtype", choices=STORE_DTYPES, default=None)
+
+    check = subparsers.add_parser(
+        "check", help="Report cosine agreement and speedup against float32"
+    )
+    check.add_argument("backend", choices=["torch", "int8", "onnx"])
+    check.add_argument("--limit", type=int, default=256)
+
+    for subparser in (reembed, check):
+        subparser.add_argument(
+            "--file-name",
+            type=str,
+            default=None,
+            help="ONNX file to load for the 'onnx' backend, "
+            "e.g. onnx/model_qint8_avx512.onnx",
+        )
+
+    args = parser.parse_args()
+    if args.file_name and args.backend != "onnx":
+        parser.error("--file-name only applies to the 'onnx' backend.")
+    backend_kwargs = {"file_name": args.file_name} if args.file_name else {}
+    backend = get_backend(args.backend, **backend_kwargs)
+
+    if args.command == "reembed":
+        count = reembed_database(args.db_path, backend, args.batch_size, args.dtype)
+        print(f"Re-embedded {count} reports with the '{args.backend}' backend.")
+    else:
+        conn = sqlite3.connect(args.db_path)
+        rows = conn.execute(
+            "SELECT text FROM reports LIMIT ?", (args.limit,)
+        ).fetchall()
+        conn.close()
+        if not rows:
+            parser.error(f"No reports in {args.db_path} to compare on.")
+        report = compare_backends([text for (text,) in rows], backend)
+        for key, value in report.items():
+            print(f"{key}: {value:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+import fcntl
+import glob
+import os
+import sqlite3
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+STORE_DTYPES = ("float32", "float16", "int8")
+
+
+class StoreSnapshot(NamedTuple):
+    """
+    A consistent, read-only view of an `EmbeddingStore`.
+
+    Attributes
+    ----------
+    ids : numpy.ndarray
+        Memory-mapped report ids, shape (count,).
+    vectors : numpy.ndarray
+        Memory-mapped vectors in the storage dtype, shape (count, dim).
+    scales : numpy.ndarray or None
+        Memory-mapped per-row scales of an int8 store, shape (count,).
+    metadata : dict
+        The metadata the snapshot was taken from.
+    """
+
+    ids: np.ndarray
+    vectors: np.ndarray
+    scales: Optional[np.ndarray]
+    metadata: Dict[str, str]
+
+    def dequantize(self, rows=None) -> np.ndarray:
+        """
+        Returns float32 vectors, optionally restricted to row positions ``rows``.
+
+        For float32 stores with ``rows=None`` this is the memory map itself; other
+        dtypes are dequantized into a new array.
+        """
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        if self.vectors.dtype == np.float32:
+            return vectors
+        if self.scales is None:
+            return vectors.astype("float32")
+        scales = self.scales if rows is None else self.scales[rows]
+        return vectors.astype("float32") * scales[:, None]
+
+
+class EmbeddingStore:
+    """
+    Contiguous, memory-mapped store of report embeddings.
+
+    Vectors live in a single row-major file aligned row-for-row with a file of
+    report ids, so index builds and exact re-ranking read them through ``np.memmap``
+    without per-row decoding. Vectors may be kept as float32, float16 (half the
+    footprint) or int8 with one float32 scale per row (a quarter of the footprint).
+
+    The ``embedding_store`` table of the SQLite database is the source of truth:
+    it records the model and backend that produced the vectors, the dimension, the
+    dtype, the number of published rows and the current file generation. Appends
+    write rows past the published count and then publish the new count; rewrites
+    write a new generation of files and then publish it. Either way the update
+    becomes visible in one SQLite transaction, so readers never see ids and vectors
+    that disagree, and an interrupted write leaves the previous state intact.
+    Writers are serialized with a file lock.
+
+    Attributes
+    ----------
+    db_path : str
+        Path to the SQLite database the store belongs to.
+    path : str
+        Directory holding the vector files.
+    dtype : str
+        Storage dtype: the existing store's, or the requested one for a new store.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "crisiswatch.db",
+        path: Optional[str] = None,
+        dtype: Optional[str] = None,
+    ):
+        if dtype is not None and dtype not in STORE_DTYPES:
+            raise ValueError(f"Unsupported store dtype '{dtype}'. Use {STORE_DTYPES}.")
+        self.db_path = db_path
+        self.path = path or os.path.splitext(db_path)[0] + ".embeddings"
+        stored = self.metadata().get("dtype")
+        if stored is not None and dtype is not None and dtype != stored:
+            raise ValueError(
+                f"Store holds {stored} vectors, not {dtype}. "
+                "Re-encode it with `write(..., dtype=...)` to change the dtype."
+            )
+        self.dtype = stored or dtype or "float32"
+
+    def metadata(self) -> Dict[str, str]:
+        """Returns the model, backend, dimension, dtype and count recorded in SQLite."""
+        conn = sqlite3.connect(self.db_path)
+        _create_metadata_table(conn)
+        rows = conn.execute("SELECT key, value FROM embedding_store").fetchall()
+        conn.close()
+        return dict(rows)
+
+    def __len__(self) -> int:
+        return int(self.metadata().get("count", 0))
+
+    def snapshot(self) -> StoreSnapshot:
+        """Memory-maps the published rows of the store."""
+        for _ in range(3):
+            meta = self.metadata()
+            try:
+                return self._open(meta)
+            except FileNotFoundError:
+                # A rewrite replaced this generation while we were opening it
+                continue
+        return self._open(self.metadata())
+
+    def ids(self) -> np.ndarray:
+        """Memory-mapped array of the report ids held by the store."""
+        return self.snapshot().ids
+
+    def raw_vectors(self) -> np.ndarray:
+        """Memory-mapped vectors in their storage dtype."""
+        return self.snapshot().vectors
+
+    def vectors(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Float32 vectors, optionally restricted to row positions ``rows``."""
+        return self.snapshot().dequantize(rows)
+
+    def write(
+        self,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        model_name: str,
+        backend: str,
+        dtype: Optional[str] = None,
+    ):
+        """
+        Replaces the whole store with ``vectors`` for report ``ids``.
+
+        Parameters
+        ----------
+        ids : numpy.ndarray
+            Report ids, one per vector.
+        vectors : numpy.ndarray
+            Float32 vectors of shape (len(ids), dim).
+        model_name : str
+            Checkpoint that produced the vectors.
+        backend : str
+            Name of the embedding backend that produced the vectors.
+        dtype : {'float32', 'float16', 'int8'}, optional
+            Storage dtype to re-encode into. Defaults to the store's current dtype.
+        """
+        if dtype is not None and dtype not in STORE_DTYPES:
+            raise ValueError(f"Unsupported store dtype '{dtype}'. Use {STORE_DTYPES}.")
+        ids, vectors = _check_rows(ids, vectors)
+        with self._lock():
+            meta = self.metadata()
+            dtype = dtype or self.dtype
+            generation = int(meta.get("generation", 0)) + 1
+            stored, scales = _quantize(vectors, dtype)
+            self._write_rows(generation, 0, ids, stored, scales)
+            self._publish(
+                model_name=model_name,
+                backend=backend,
+                dim=str(vectors.shape[1]),
+                dtype=dtype,
+                count=str(len(ids)),
+                generation=str(generation),
+            )
+            self.dtype = dtype
+            self._remove_stale_generations(keep=(generation - 1, generation))
+
+    def append(
+        self, ids: np.ndarray, vectors: np.ndarray, model_name: str, backend: str
+    ) -> int:
+        """
+        Adds ``vectors`` for report ``ids`` after the existing rows.
+
+        Only the new rows are written; existing rows are neither read nor
+        re-quantized. Ids that are already stored are skipped.
+
+        Returns
+        -------
+        int
+            The number of rows added.
+        """
+        ids, vectors = _check_rows(ids, vectors)
+        with self._lock():
+            meta = self.metadata()
+            if not meta:
+                if len(ids):
+                    self._write_new(ids, vectors, model_name, backend)
+                return len(ids)
+            if int(meta["dim"]) != vectors.shape[1]:
+                raise ValueError(
+                    f"Store holds {meta['dim']}-d vectors, got {vectors.shape[1]}-d."
+                )
+            if (meta["model_name"], meta["backend"]) != (model_name, backend):
+                raise ValueError(
+                    f"Store was built with '{meta['model_name']}' on the "
+                    f"'{meta['backend']}' backend, not '{model_name}' on "
+                    f"'{backend}'. Re-embed the database to switch."
+                )
+
+            fresh = ~np.isin(ids, self._open(meta).ids)
+            ids, vectors = ids[fresh], vectors[fresh]
+            if len(ids) == 0:
+                return 0
+
+            count = int(meta["count"])
+            stored, scales = _quantize(vectors, meta["dtype"])
+            self._write_rows(int(meta["generation"]), count, ids, stored, scales)
+            self._publish(count=str(count + len(ids)))
+            return len(ids)
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 5,
+        candidate_ids=None,
+        chunk_size: int = 4096,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact inner-product search, optionally re-ranking only ``candidate_ids``.
+
+        Rows are dequantized and scored ``chunk_size`` at a time while a running
+        top-k is kept, so a quantized store is never expanded to float32 as a whole.
+
+        Returns
+        -------
+        scores, ids : numpy.ndarray
+            The ``top_k`` best scores and report ids, best first.
+        """
+        snapshot = self.snapshot()
+        query = np.asarray(query, dtype="float32").ravel()
+        if candidate_ids is None:
+            n_rows = len(snapshot.ids)
+            chunks = (slice(i, i + chunk_size) for i in range(0, n_rows, chunk_size))
+        else:
+            matches = np.flatnonzero(np.isin(snapshot.ids, np.asarray(candidate_ids)))
+            chunks = (
+                matches[i : i + chunk_size] for i in range(0, len(matches), chunk_size)
+            )
+
+        best_scores = np.empty(0, dtype="float32")
+        best_ids = np.empty(0, dtype="int64")
+        for rows in chunks:
+            best_scores = np.concatenate(
+                [best_scores, snapshot.dequantize(rows) @ query]
+            )
+            best_ids = np.concatenate([best_ids, snapshot.ids[rows]])
+            if len(best_scores) > top_k:
+                keep = np.argpartition(-best_scores, top_k)[:top_k]
+                best_scores, best_ids = best_scores[keep], best_ids[keep]
+        order = np.argsort(-best_scores)[:top_k]
+        return best_scores[order], best_ids[order]
+
+    def _write_new(self, ids, vectors, model_name, backend):
+        stored, scales = _quantize(vectors, self.dtype)
+        self._write_rows(1, 0, ids, stored, scales)
+        self._publish(
+            model_name=model_name,
+            backend=backend,
+            dim=str(vectors.shape[1]),
+            dtype=self.dtype,
+            count=str(len(ids)),
+            generation="1",
+        )
+
+    def _file(self, name: str, generation: int) -> str:
+        return os.path.join(self.path, f"{name}.{generation}.bin")
+
+    def _open(self, meta: Dict[str, str]) -> StoreSnapshot:
+        count = int(meta.get("count", 0))
+        if count == 0:
+            dim = int(meta.get("dim", 0))
+            return StoreSnapshot(
+                np.empty(0, dtype="int64"),
+                np.empty((0, dim), dtype=meta.get("dtype", self.dtype)),
+                None,
+                meta,
+            )
+        generation = int(meta["generation"])
+        dim = int(meta["dim"])
+        ids = np.memmap(
+            self._file("ids", generation), dtype="int64", mode="r", shape=(count,)
+        )
+        vectors = np.memmap(
+            self._file("vectors", generation),
+            dtype=meta["dtype"],
+            mode="r",
+            shape=(count, dim),
+        )
+        scales = None
+        if meta["dtype"] == "int8":
+            scales = np.memmap(
+                self._file("scales", generation),
+                dtype="float32",
+                mode="r",
+                shape=(count,),
+            )
+        return StoreSnapshot(ids, vectors, scales, meta)
+
+    def _write_rows(
+        self,
+        generation: int,
+        start: int,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        scales: Optional[np.ndarray],
+    ):
+        """Writes rows from position ``start``, discarding any unpublished tail."""
+        os.makedirs(self.path, exist_ok=True)
+        arrays = [("ids", ids), ("vectors", vectors)]
+        if scales is not None:
+            arrays.append(("scales", scales))
+        for name, array in arrays:
+            row_bytes = array.itemsize * int(np.prod(array.shape[1:], dtype=int))
+            with open(self._file(name, generation), "ab+") as f:
+                f.truncate(start * row_bytes)
+                f.write(np.ascontiguousarray(array).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _publish(self, **values: str):
+        conn = sqlite3.connect(self.db_path)
+        _create_metadata_table(conn)
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_store (key, value) VALUES (?, ?)",
+                list(values.items()),
+            )
+        conn.close()
+
+    def _remove_stale_generations(self, keep: Tuple[int, ...]):
+        # The previous generation is kept for readers that looked up the metadata
+        # just before the switch but have not opened the files yet.
+        for file in glob.glob(os.path.join(self.path, "*.*.bin")):
+            generation = int(file.rsplit(".", 2)[1])
+            if generation not in keep:
+                os.remove(file)
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _create_metadata_table(conn: sqlite3.Connection):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS embedding_store (key TEXT PRIMARY KEY, value TEXT)"
+    )
+
+
+def _check_rows(ids, vectors) -> Tuple[np.ndarray, np.ndarray]:
+    ids = np.asarray(ids, dtype="int64")
+    vectors = np.asarray(vectors, dtype="float32")
+    if vectors.ndim != 2 or len(vectors) != len(ids):
+        raise ValueError("Expected one vector per id in a 2-D array.")
+    return ids, vectors
+
+
+def _quantize(
+    vectors: np.ndarray, dtype: str
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Converts float32 vectors to the storage dtype, with per-row scales for int8."""
+    if dtype != "int8":
+        return vectors.astype(dtype), None
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(vectors / scales[:, None]).astype("int8")
+    return quantized, scales.astype("float32")
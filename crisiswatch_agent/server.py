@@ -0,0 +1,207 @@
+import json
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Literal, Tuple
+
+from crisiswatch_agent.agent import create_agent
+from crisiswatch_agent.batching import MicroBatcher
+from crisiswatch_agent.client import DEFAULT_HOST, DEFAULT_PORT
+from crisiswatch_agent.rag.embeddings import (
+    build_faiss_index,
+    embed_texts,
+    update_embeddings,
+)
+from crisiswatch_agent.tools.search import lookup_reports, set_search_backend
+
+
+class CrisisWatchServer:
+    """
+    Keeps the agent, embedding model, FAISS index and database connection resident
+    between requests.
+
+    Retrieval requests are micro-batched: all queries arriving within the batching
+    window are embedded in one forward pass and searched against the index with a
+    single ``index.search`` call. The agent's ``search_reports_rag`` tool is routed
+    through the same path, so agent runs also use the resident index and connection.
+    Agent runs are queued through their own batcher so the (stateful, non
+    thread-safe) agent is only ever driven by one thread.
+
+    Attributes
+    ----------
+    db_path : str
+        Path to the SQLite database.
+    agent : CodeAgent
+        The resident agent used for ``/query`` requests.
+    index : faiss.Index
+        The resident FAISS index used for ``/search`` requests.
+    """
+
+    def __init__(
+        self,
+        model: Literal["openai", "smollm"] = "smollm",
+        db_path: str = "crisiswatch.db",
+        batch_window: float = 0.01,
+        max_batch_size: int = 32,
+    ):
+        self.db_path = db_path
+        self.agent = create_agent(model=model, db_path=db_path)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._index_lock = threading.Lock()
+        self.index = None
+        self.refresh_index()
+        self._search_batcher = MicroBatcher(
+            self._search_batch, max_batch_size=max_batch_size, max_wait=batch_window
+        )
+        self._query_batcher = MicroBatcher(
+            self._query_batch, max_batch_size=max_batch_size, max_wait=batch_window
+        )
+        set_search_backend(self.search)
+
+    def refresh_index(self) -> int:
+        """Embeds any new reports and rebuilds the resident index. Returns its size."""
+        update_embeddings(db_path=self.db_path)
+        index = build_faiss_index(db_path=self.db_path)
+        with self._index_lock:
+            self.index = index
+        return index.ntotal
+
+    def search(self, query: str, top_k: int = 5) -> Dict[str, list]:
+        """Retrieves the ``top_k`` reports most similar to ``query``."""
+        return self._search_batcher.submit((query, top_k))
+
+    def query(self, query: str) -> Any:
+        """Runs the agent on ``query``."""
+        return self._query_batcher.submit(query)
+
+    def close(self):
+        set_search_backend(None)
+        self._search_batcher.close()
+        self._query_batcher.close()
+        self._conn.close()
+
+    def _search_batch(self, items: List[Tuple[str, int]]) -> List[Dict[str, list]]:
+        # Reports added since the last build (e.g. by the agent's fetch tool)
+        (n_reports,) = self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()
+        if n_reports > self.index.ntotal:
+            self.refresh_index()
+        with self._index_lock:
+            index = self.index
+        if index.ntotal == 0:
+            return [lookup_reports(self._conn, []) for _ in items]
+
+        vectors = embed_texts([query for query, _ in items])
+        max_k = max(top_k for _, top_k in items)
+        _, result_ids = index.search(vectors, max_k)
+        return [
+            lookup_reports(self._conn, row[:top_k])
+            for row, (_, top_k) in zip(result_ids, items)
+        ]
+
+    def _query_batch(self, queries: List[str]) -> List[Any]:
+        results = []
+        for query in queries:
+            try:
+                results.append(self.agent.run(query))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class CrisisWatchRequestHandler(BaseHTTPRequestHandler):
+    """JSON-over-HTTP front end for a :class:`CrisisWatchServer`."""
+
+    server_version = "CrisisWatch/0.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "indexed": self.server.app.index.ntotal})
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        app: CrisisWatchServer = self.server.app
+        if self.path not in ("/query", "/search", "/refresh"):
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        # Only malformed payloads are the client's fault; errors raised while
+        # serving the request are reported as 500 below.
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if self.path != "/refresh":
+                query = payload["query"]
+                if not isinstance(query, str):
+                    raise ValueError("'query' must be a string")
+                top_k = int(payload.get("top_k", 5))
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {"error": f"Bad request: {e}"})
+            return
+
+        try:
+            if self.path == "/query":
+                body = {"response": app.query(query)}
+            elif self.path == "/search":
+                body = app.search(query, top_k)
+            else:
+                body = {"indexed": app.refresh_index()}
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+            return
+        self._send(200, body)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(
+    model: Literal["openai", "smollm"] = "smollm",
+    db_path: str = "crisiswatch.db",
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    batch_window: float = 0.01,
+    max_batch_size: int = 32,
+):
+    """
+    Loads the models once and serves requests on ``host:port`` until interrupted.
+
+    Parameters
+    ----------
+    model : {'openai', 'smollm'}
+        The model backend to use for the agent.
+    db_path : str
+        Path to the SQLite database.
+    host : str
+        Interface to bind. Defaults to localhost only.
+    port : int
+        TCP port to bind.
+    batch_window : float
+        Seconds to wait for further requests before running a batch.
+    max_batch_size : int
+        Maximum number of requests served by a single batch.
+    """
+    app = CrisisWatchServer(
+        model=model,
+        db_path=db_path,
+        batch_window=batch_window,
+        max_batch_size=max_batch_size,
+    )
+    httpd = ThreadingHTTPServer((host, port), CrisisWatchRequestHandler)
+    httpd.app = app
+    print(f"CrisisWatch server listening on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        app.close()
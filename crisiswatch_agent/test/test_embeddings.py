@@ -0,0 +1,121 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import faiss
+import numpy as np
+
+from crisiswatch_agent.rag.backends import EmbeddingBackend, get_backend
+from crisiswatch_agent.rag import embeddings
+from crisiswatch_agent.rag.embeddings import (
+    build_faiss_index,
+    compare_backends,
+    reembed_database,
+    update_embeddings,
+)
+from crisiswatch_agent.rag.store import EmbeddingStore
+
+
+class FixedBackend(EmbeddingBackend):
+    """Deterministic backend that embeds a text from its length, with optional noise."""
+
+    name = "fixed"
+
+    def __init__(self, noise: float = 0.0):
+        super().__init__()
+        self.noise = noise
+
+    def encode(self, texts, batch_size=32):
+        rng = np.random.default_rng(0)
+        vectors = np.array(
+            [[len(t), 1.0, 2.0, 3.0] for t in texts], dtype="float32"
+        ) + self.noise * rng.standard_normal((len(texts), 4)).astype("float32")
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestEmbeddingBackends(unittest.TestCase):
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_backend("fp4")
+
+    def test_compare_backends(self):
+        texts = ["a", "bb", "ccc", "dddd"]
+        identical = compare_backends(texts, FixedBackend(), baseline=FixedBackend())
+        self.assertAlmostEqual(identical["mean_cosine"], 1.0, places=5)
+
+        noisy = compare_backends(texts, FixedBackend(noise=0.5), FixedBackend())
+        self.assertLess(noisy["min_cosine"], 1.0)
+        self.assertLessEqual(noisy["min_cosine"], noisy["mean_cosine"])
+
+    def test_reembed_database(self):
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE reports (id INTEGER PRIMARY KEY, text TEXT)")
+        conn.execute(
+            "CREATE TABLE embeddings (report_id INTEGER PRIMARY KEY, embedding BLOB)"
+        )
+        conn.executemany(
+            "INSERT INTO reports (id, text) VALUES (?, ?)", [(1, "a"), (2, "bb")]
+        )
+        conn.commit()
+        conn.close()
+
+        backend = FixedBackend()
+        self.assertEqual(reembed_database(db_path, backend, batch_size=1), 2)
+
+        store = EmbeddingStore(db_path)
+        np.testing.assert_array_equal(store.ids(), [1, 2])
+        np.testing.assert_allclose(store.vectors(), backend.encode(["a", "bb"]))
+        self.assertEqual(store.metadata()["backend"], backend.name)
+
+        reembed_database(db_path, backend, dtype="float16")
+        index = build_faiss_index(db_path)
+        self.assertIsInstance(
+            faiss.downcast_index(index.index), faiss.IndexScalarQuantizer
+        )
+        _, ids = index.search(backend.encode(["bb"]), 1)
+        self.assertEqual(ids[0, 0], 2)
+
+        os.close(fd)
+        os.remove(db_path)
+        shutil.rmtree(store.path)
+
+    def test_update_embeddings_only_encodes_new_reports(self):
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE reports (id INTEGER PRIMARY KEY, text TEXT)")
+        conn.executemany(
+            "INSERT INTO reports (id, text) VALUES (?, ?)", [(1, "a"), (2, "bb")]
+        )
+        conn.commit()
+
+        backend = FixedBackend()
+        encoded = []
+        encode = backend.encode
+        backend.encode = lambda texts, batch_size=32: (
+            encoded.extend(texts) or encode(texts, batch_size)
+        )
+        previous = embeddings.embedding_backend
+        embeddings.set_embedding_backend(backend)
+        try:
+            update_embeddings(db_path, batch_size=1)
+            conn.execute("INSERT INTO reports (id, text) VALUES (3, 'ccc')")
+            conn.commit()
+            update_embeddings(db_path, batch_size=1)
+        finally:
+            embeddings.set_embedding_backend(previous)
+            conn.close()
+
+        store = EmbeddingStore(db_path)
+        self.assertEqual(encoded, ["a", "bb", "ccc"])
+        np.testing.assert_array_equal(store.ids(), [1, 2, 3])
+
+        os.close(fd)
+        os.remove(db_path)
+        shutil.rmtree(store.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from crisiswatch_agent.batching import MicroBatcher
+from crisiswatch_agent.server import CrisisWatchRequestHandler, CrisisWatchServer
+from crisiswatch_agent.tools.search import search_reports_rag
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_concurrent_requests_share_a_batch(self):
+        batch_sizes = []
+
+        def double(items):
+            batch_sizes.append(len(items))
+            return [2 * item for item in items]
+
+        batcher = MicroBatcher(double, max_batch_size=8, max_wait=0.2)
+        results = {}
+
+        def submit(i):
+            results[i] = batcher.submit(i)
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batcher.close()
+
+        self.assertEqual(results, {i: 2 * i for i in range(4)})
+        self.assertLess(len(batch_sizes), 4)
+        self.assertEqual(sum(batch_sizes), 4)
+
+    def test_max_batch_size_is_respected(self):
+        batch_sizes = []
+
+        def identity(items):
+            batch_sizes.append(len(items))
+            return items
+
+        batcher = MicroBatcher(identity, max_batch_size=2, max_wait=0.2)
+        threads = [threading.Thread(target=batcher.submit, args=(i,)) for i in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batcher.close()
+
+        self.assertTrue(all(size <= 2 for size in batch_sizes))
+        self.assertEqual(sum(batch_sizes), 5)
+
+    def test_errors_propagate_to_every_caller(self):
+        def fail(items):
+            raise ValueError("boom")
+
+        batcher = MicroBatcher(fail, max_wait=0.0)
+        with self.assertRaises(ValueError):
+            batcher.submit("x")
+        batcher.close()
+
+    def test_per_item_errors_only_fail_their_caller(self):
+        def invert(items):
+            return [ZeroDivisionError() if item == 0 else 1 / item for item in items]
+
+        batcher = MicroBatcher(invert, max_batch_size=8, max_wait=0.2)
+        results, errors = {}, {}
+
+        def submit(i):
+            try:
+                results[i] = batcher.submit(i)
+            except ZeroDivisionError as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batcher.close()
+
+        self.assertEqual(list(errors), [0])
+        self.assertEqual(results, {1: 1.0, 2: 0.5})
+
+
+class TestCrisisWatchServer(unittest.TestCase):
+    def setUp(self):
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix=".db")
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute("""
+            CREATE TABLE reports (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT,
+                title TEXT,
+                url TEXT,
+                text TEXT,
+                region TEXT,
+                summary TEXT
+            )
+            """)
+        conn.executemany(
+            "INSERT INTO reports (date, title, url, text) VALUES (?, ?, ?, ?)",
+            [
+                ("2023-07-01", "Conflict in A", "url-a", "Fighting escalated in A."),
+                ("2023-08-01", "Election in B", "url-b", "B held a disputed vote."),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        self.agent = MagicMock()
+        with patch("crisiswatch_agent.server.create_agent", return_value=self.agent):
+            self.server = CrisisWatchServer(db_path=self.test_db_path)
+
+    def tearDown(self):
+        self.server.close()
+        os.close(self.test_db_fd)
+        os.remove(self.test_db_path)
+        shutil.rmtree(os.path.splitext(self.test_db_path)[0] + ".embeddings", True)
+
+    def test_failed_agent_run_does_not_fail_the_batch(self):
+        self.agent.run.side_effect = lambda query: 1 / len(query)
+        self.assertEqual(self.server._query_batch(["", "ab"])[1], 0.5)
+        self.assertIsInstance(self.server._query_batch([""])[0], ZeroDivisionError)
+
+    def test_agent_search_uses_resident_index(self):
+        with patch("crisiswatch_agent.tools.search.build_faiss_index") as build:
+            result = search_reports_rag(
+                "Fighting escalated in A.", top_k=1, db_path=self.test_db_path
+            )
+        build.assert_not_called()
+        self.assertEqual(result["titles"], ["Conflict in A"])
+
+    def test_agent_search_with_default_db_path_uses_server_db(self):
+        # The agent calls the tool without db_path; the server's database is
+        # at a non-default path
+        with patch("crisiswatch_agent.tools.search.update_embeddings") as update:
+            result = search_reports_rag("B held a disputed vote.", top_k=1)
+        update.assert_not_called()
+        self.assertEqual(result["titles"], ["Election in B"])
+
+    def test_http_errors(self):
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), CrisisWatchRequestHandler)
+        httpd.app = self.server
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+
+        def post(path, payload):
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{httpd.server_port}{path}",
+                data=json.dumps(payload).encode("utf-8"),
+            )
+            try:
+                with urllib.request.urlopen(request) as response:
+                    return response.status
+            except urllib.error.HTTPError as e:
+                return e.code
+
+        self.agent.run.side_effect = ValueError("agent failed")
+        try:
+            self.assertEqual(post("/search", {"query": "A", "top_k": 1}), 200)
+            self.assertEqual(post("/search", {"top_k": 1}), 400)
+            self.assertEqual(post("/search", {"query": "A", "top_k": "x"}), 400)
+            self.assertEqual(post("/query", {"query": "A"}), 500)
+            self.assertEqual(post("/unknown", {}), 404)
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+    def test_new_reports_are_indexed(self):
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute(
+            "INSERT INTO reports (date, title, url, text) VALUES (?, ?, ?, ?)",
+            ("2023-09-01", "Floods in C", "url-c", "Floods displaced thousands in C."),
+        )
+        conn.commit()
+        conn.close()
+
+        result = self.server.search("Floods displaced thousands in C.", top_k=1)
+        self.assertEqual(result["titles"], ["Floods in C"])
+        self.assertEqual(self.server.index.ntotal, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
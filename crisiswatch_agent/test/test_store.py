@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from crisiswatch_agent.rag.store import EmbeddingStore
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    def setUp(self):
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix=".db")
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((10, 8)).astype("float32")
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.ids = np.arange(100, 110)
+
+    def tearDown(self):
+        os.close(self.test_db_fd)
+        os.remove(self.test_db_path)
+        shutil.rmtree(os.path.splitext(self.test_db_path)[0] + ".embeddings", True)
+
+    def test_roundtrip_and_metadata(self):
+        store = EmbeddingStore(self.test_db_path)
+        store.write(self.ids, self.vectors, "test-model", "torch")
+
+        self.assertIsInstance(store.vectors(), np.memmap)
+        np.testing.assert_array_equal(store.ids(), self.ids)
+        np.testing.assert_array_equal(store.vectors(), self.vectors)
+        metadata = EmbeddingStore(self.test_db_path).metadata()
+        self.assertEqual(metadata["model_name"], "test-model")
+        self.assertEqual(metadata["backend"], "torch")
+        self.assertEqual((metadata["dim"], metadata["count"]), ("8", "10"))
+
+    def test_quantized_dtypes(self):
+        for dtype, atol in (("float16", 1e-3), ("int8", 1e-2)):
+            store = EmbeddingStore(self.test_db_path)
+            store.write(self.ids, self.vectors, "test-model", "torch", dtype=dtype)
+            reopened = EmbeddingStore(self.test_db_path)
+            self.assertEqual(reopened.dtype, dtype)
+            self.assertEqual(reopened.raw_vectors().dtype, np.dtype(dtype))
+            np.testing.assert_allclose(reopened.vectors(), self.vectors, atol=atol)
+
+    def test_requested_dtype_must_match(self):
+        EmbeddingStore(self.test_db_path).write(
+            self.ids, self.vectors, "test-model", "torch"
+        )
+        with self.assertRaises(ValueError):
+            EmbeddingStore(self.test_db_path, dtype="int8")
+
+    def test_append_only_writes_new_rows(self):
+        store = EmbeddingStore(self.test_db_path, dtype="int8")
+        store.append(self.ids[:5], self.vectors[:5], "test-model", "torch")
+        before = store.raw_vectors().copy()
+        added = store.append(self.ids[3:], self.vectors[3:], "test-model", "torch")
+
+        self.assertEqual(added, 5)
+        self.assertEqual(len(store), 10)
+        np.testing.assert_array_equal(store.ids(), self.ids)
+        np.testing.assert_array_equal(store.raw_vectors()[:5], before)
+        np.testing.assert_allclose(store.vectors(), self.vectors, atol=1e-2)
+
+    def test_append_checks_model_and_backend(self):
+        store = EmbeddingStore(self.test_db_path)
+        store.append(self.ids[:5], self.vectors[:5], "test-model", "torch")
+        with self.assertRaises(ValueError):
+            store.append([200], self.vectors[:1], "other-model", "torch")
+        with self.assertRaises(ValueError):
+            store.append([200], self.vectors[:1], "test-model", "onnx")
+
+    def test_rewrite_keeps_snapshot_readable(self):
+        store = EmbeddingStore(self.test_db_path)
+        store.write(self.ids, self.vectors, "test-model", "torch")
+        snapshot = store.snapshot()
+        store.write(self.ids[:2], self.vectors[:2], "test-model", "torch")
+
+        np.testing.assert_array_equal(snapshot.ids, self.ids)
+        np.testing.assert_array_equal(store.ids(), self.ids[:2])
+
+    def test_search_and_rerank(self):
+        store = EmbeddingStore(self.test_db_path, dtype="int8")
+        store.write(self.ids, self.vectors, "test-model", "torch")
+
+        scores, ids = store.search(self.vectors[3], top_k=2)
+        self.assertEqual(ids[0], 103)
+        self.assertGreater(scores[0], scores[1])
+
+        _, ids = store.search(self.vectors[3], top_k=3, candidate_ids=[101, 102])
+        self.assertEqual(sorted(ids), [101, 102])
+
+    def test_search_in_chunks_matches_full_scan(self):
+        store = EmbeddingStore(self.test_db_path, dtype="float16")
+        store.write(self.ids, self.vectors, "test-model", "torch")
+
+        expected = np.argsort(-(store.vectors() @ self.vectors[6]))[:4]
+        scores, ids = store.search(self.vectors[6], top_k=4, chunk_size=3)
+        np.testing.assert_array_equal(ids, self.ids[expected])
+        self.assertTrue(np.all(np.diff(scores) <= 0))
+
+        _, ids = store.search(
+            self.vectors[6], top_k=2, candidate_ids=[101, 106, 108], chunk_size=1
+        )
+        self.assertEqual(ids[0], 106)
+        self.assertEqual(len(ids), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
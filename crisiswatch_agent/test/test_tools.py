@@ -2,12 +2,28 @@ import unittest
 from unittest.mock import patch, MagicMock
 from crisiswatch_agent.tools.fetch import prepopulate_from_urls
 from crisiswatch_agent.tools.search import search_reports_rag
-from crisiswatch_agent.tools.summarize import summarize_reports
+from crisiswatch_agent.tools.summarize import (
+    PrefixCachedGenerator,
+    format_chat_prompt,
+    get_prefix_generator,
+    set_stream_handler,
+    stream_summary,
+    summarize_reports,
+    _fit_to_budget,
+)
 import os
+import shutil
 import tempfile
 import sqlite3
 import fitz  # PyMuPDF
-
+import torch
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+from transformers import (
+    LlamaConfig,
+    LlamaForCausalLM,
+    PreTrainedTokenizerFast,
+    pipeline,
+)
 
 CORRECT_SUMMARY = """Here is a summary of the CrisisWatch reports:\n\n**Conflict in X:**\n\n* Escalating violence in X, with reports of increased fighting and casualties.\n* The conflict has been ongoing for several months, with multiple factions vying for control of the region.\n* The United Nations has deployed troops to X to support the local authorities and provide humanitarian aid.\n* The situation remains volatile, with reports of rocket attacks and ambushes.\n\n**Conflict in Y:**\n\n* Political unrest in Y, with protests and demonstrations erupting in response to economic sanctions and political repression.\n* The government has been accused of human rights abuses and corruption, with many citizens feeling disillusioned with the ruling party.\n* The international community has been criticized for its response to the crisis, with some countries imposing economic sanctions and others providing military aid.\n* The situation remains tense, with reports of clashes between protesters and security forces.\n\n**Crisis in Z:**\n\n* A series of natural disasters have struck the region, including a devastating earthquake in Z, which has killed hundreds of people and destroyed entire communities.\n* The government has been accused of mismanaging the disaster response, with many areas still recovering from the initial impact.\n* The international community has been criticized for its response to the crisis, with some countries imposing economic sanctions and others providing humanitarian aid.\n* The situation remains unstable, with reports of looting and violence in some areas"""
 
@@ -17,8 +33,7 @@ class TestCrisisWatchTools(unittest.TestCase):
         self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix=".db")
         conn = sqlite3.connect(self.test_db_path)
         cur = conn.cursor()
-        cur.execute(
-            """
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS reports (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 date TEXT,
@@ -28,17 +43,14 @@ class TestCrisisWatchTools(unittest.TestCase):
                 region TEXT,
                 summary TEXT
             );
-        """
-        )
-        cur.execute(
-            """
+        """)
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS embeddings (
                 report_id INTEGER PRIMARY KEY,
                 embedding BLOB,
                 FOREIGN KEY(report_id) REFERENCES reports(id)
             );
-            """
-        )
+            """)
 
         conn.commit()
         conn.close()
@@ -46,6 +58,7 @@ class TestCrisisWatchTools(unittest.TestCase):
     def tearDown(self):
         os.close(self.test_db_fd)
         os.remove(self.test_db_path)
+        shutil.rmtree(os.path.splitext(self.test_db_path)[0] + ".embeddings", True)
 
     def generate_sample_pdf_bytes(self) -> bytes:
         doc = fitz.open()
@@ -109,6 +122,98 @@ class TestCrisisWatchTools(unittest.TestCase):
         self.assertIsInstance(result, str)
         self.assertAlmostEqual(result, CORRECT_SUMMARY)
 
+    def test_fit_to_budget_map_reduces_long_report_lists(self):
+        generator = MagicMock()
+        generator.count_tokens.side_effect = lambda text: len(text.split())
+        generator.truncate.side_effect = lambda text, n: " ".join(text.split()[:n])
+        generator.stream.side_effect = lambda text, *args: iter(["short", " summary"])
+
+        lines = [f"- Report {i}: " + "word " * 20 for i in range(10)]
+        report_text = _fit_to_budget(
+            generator, lines, max_prompt_tokens=50, max_new_tokens=10, do_sample=False
+        )
+
+        self.assertLessEqual(generator.count_tokens(report_text), 50)
+        self.assertIn("short summary", report_text)
+        self.assertEqual(generator.stream.call_count, 5)
+
+
+def tiny_chat_pipeline(corpus):
+    """
+    A randomly initialised two-layer Llama with a BPE tokenizer trained on ``corpus``,
+    built locally so the summarization path can be tested without the Hub.
+    """
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    tokenizer.train_from_iterator(
+        corpus,
+        trainers.BpeTrainer(
+            vocab_size=300, special_tokens=["<|im_start|>", "<|im_end|>"]
+        ),
+    )
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, eos_token="<|im_end|>", pad_token="<|im_end|>"
+    )
+    torch.manual_seed(0)
+    config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=64,
+        intermediate_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+    )
+    model = LlamaForCausalLM(config).eval()
+    return pipeline("text-generation", model=model, tokenizer=tokenizer)
+
+
+class TestPrefixCachedSummaries(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.reports = [
+            {"title": "Conflict in X", "summary": "Escalating violence in X."},
+            {"title": "Conflict in Y", "summary": "Political unrest in Y."},
+        ]
+        cls.report_text = "\n".join(
+            f"- {r['title']}: {r['summary']}" for r in cls.reports
+        )
+        cls.pipeline = tiny_chat_pipeline([format_chat_prompt(cls.report_text)] * 20)
+
+    def tearDown(self):
+        set_stream_handler(None)
+
+    def test_prompt_reuses_prefix_cache(self):
+        generator = get_prefix_generator(self.pipeline)
+        self.assertIsInstance(generator, PrefixCachedGenerator)
+        self.assertIs(get_prefix_generator(self.pipeline), generator)
+
+        input_ids = generator._encode_prompt(format_chat_prompt(self.report_text))
+        self.assertIsNotNone(generator._prefix_cache_for(input_ids))
+
+    def test_cached_summary_matches_plain_pipeline(self):
+        expected = self.pipeline(
+            format_chat_prompt(self.report_text),
+            max_new_tokens=300,
+            do_sample=False,
+            return_full_text=False,
+        )[0]["generated_text"]
+
+        result = summarize_reports(self.reports, model=self.pipeline, do_sample=False)
+        self.assertEqual(result, expected.strip())
+
+    def test_stream_handler_receives_streamed_pieces(self):
+        received = []
+        set_stream_handler(received.append)
+        pieces = list(
+            stream_summary(self.reports, model=self.pipeline, do_sample=False)
+        )
+
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual(received, pieces)
+
 
 if __name__ == "__main__":
     unittest.main()
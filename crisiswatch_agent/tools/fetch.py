@@ -17,7 +17,7 @@ def init_db(db_path: str = "crisiswatch.db"):
     """Initializes SQLite DB and creates tables."""
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
-    cursor.execute(
+    cur.execute(
         """
         CREATE TABLE IF NOT EXISTS reports (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -5,9 +5,23 @@ from crisiswatch_agent.rag.embeddings import (
 )
 import numpy as np
 import sqlite3
-from typing import List
+from typing import Callable, Dict, List, Optional
 from smolagents import tool
 
+_search_backend: Optional[Callable[[str, int], Dict[str, list]]] = None
+
+
+def set_search_backend(backend: Optional[Callable[[str, int], Dict[str, list]]]):
+    """
+    Routes every `search_reports_rag` call to ``backend(query, top_k)``, e.g. a
+    server's resident index, instead of rebuilding the index per call. The backend
+    serves its own database, so the ``db_path`` the tool is called with (usually
+    left at its default by the agent) is ignored. Pass None to restore the default
+    behaviour.
+    """
+    global _search_backend
+    _search_backend = backend
+
 
 @tool
 def search_reports_rag(
@@ -24,15 +38,40 @@ def search_reports_rag(
     Returns:
         A list of matching report IDs ranked by relevance to the query.
     """
+    if _search_backend is not None:
+        return _search_backend(query, top_k)
+
     vec = embed_text(query)
     update_embeddings(db_path=db_path)
     index = build_faiss_index(db_path=db_path)
     if index.ntotal == 0:
-        return ["Index is empty. Run fetch_crisiswatch_data first."]
+        return ["Index is empty. Run prepopulate_from_urls first."]
 
     scores, result_ids = index.search(np.array(vec), top_k)
-    result_ids = result_ids[0]
     conn = sqlite3.connect(db_path)
+    results = lookup_reports(conn, result_ids[0])
+    conn.close()
+    return results
+
+
+def lookup_reports(conn: sqlite3.Connection, result_ids) -> Dict[str, list]:
+    """
+    Fetches the report rows for a ranked list of FAISS result ids.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Open connection to the CrisisWatch database.
+    result_ids : iterable of int
+        Report ids in ranked order. Ids without a matching row (e.g. FAISS's -1
+        padding) are skipped.
+
+    Returns
+    -------
+    dict
+        Column-oriented results keyed by 'ids', 'titles', 'dates', 'urls',
+        'texts', 'regions' and 'summaries'.
+    """
     cur = conn.cursor()
 
     ids = []
@@ -54,7 +93,6 @@ def search_reports_rag(
             regions.append(row[5])
             summaries.append(row[6])
 
-    conn.close()
     return {
         "ids": ids,
         "titles": titles,
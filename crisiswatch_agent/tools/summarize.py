@@ -1,17 +1,36 @@
-from typing import List, Dict, Optional, Any
+import copy
+import weakref
+from functools import lru_cache
+from threading import Thread
+from typing import List, Dict, Optional, Any, Callable, Iterator
 from smolagents import tool
 from transformers import (
     AutoTokenizer,
     AutoModelForCausalLM,
     TextGenerationPipeline,
+    TextIteratorStreamer,
     pipeline,
 )
 import torch
 
+# The cached prefix ends right after the user header so that it always ends on a
+# token boundary; everything after it is tokenized together with the reports.
+PROMPT_PREFIX = (
+    "<|im_start|>system\n"
+    "You are a geopolitical analyst assistant that summarizes crisis reports.<|im_end|>\n"
+    "<|im_start|>user\n"
+)
+PROMPT_INSTRUCTION = "Summarize the following CrisisWatch reports in a concise, markdown-formatted paragraph:\n\n"
+PROMPT_SUFFIX = "<|im_end|>\n<|im_start|>assistant\n"
+
+_stream_handler: Optional[Callable[[str], None]] = None
 
+
+@lru_cache(maxsize=1)
 def get_smollm_chat_pipeline() -> TextGenerationPipeline:
     """
     Load the default HuggingFace SmolLM-360M-Instruct model with chat formatting.
+    The pipeline is loaded once per process and reused.
     """
     model_name = "HuggingFaceTB/SmolLM-360M-Instruct"
     tokenizer = AutoTokenizer.from_pretrained(model_name)
@@ -27,14 +46,205 @@ def format_chat_prompt(report_text: str) -> str:
     """
     Formats a user/system prompt for SmolLM-Instruct models.
     """
-    return (
-        "<|im_start|>system\n"
-        "You are a geopolitical analyst assistant that summarizes crisis reports.<|im_end|>\n"
-        "<|im_start|>user\n"
-        f"Summarize the following CrisisWatch reports in a concise, markdown-formatted paragraph:\n\n{report_text}<|im_end|>\n"
-        "<|im_start|>assistant\n"
+    return PROMPT_PREFIX + PROMPT_INSTRUCTION + report_text + PROMPT_SUFFIX
+
+
+def set_stream_handler(handler: Optional[Callable[[str], None]]):
+    """
+    Registers a callback that receives summary text as it is generated, e.g. to
+    print tokens while the agent is still running. Pass None to disable.
+    """
+    global _stream_handler
+    _stream_handler = handler
+
+
+class PrefixCachedGenerator:
+    """
+    Streams completions of `format_chat_prompt` prompts, reusing the KV cache of
+    the constant `PROMPT_PREFIX`.
+
+    The prefix is run through the model once. Each request tokenizes its whole
+    prompt and, when it starts with the prefix tokens, only pre-fills the rest on top
+    of a copy of that cache; otherwise it falls back to an uncached pre-fill.
+
+    Attributes
+    ----------
+    model : transformers.PreTrainedModel
+        The causal language model.
+    tokenizer : transformers.PreTrainedTokenizer
+        Its tokenizer.
+    prefix_ids : torch.Tensor
+        Token ids of `PROMPT_PREFIX`, shape (1, n_prefix_tokens).
+    prefix_cache : transformers.Cache
+        Key/value cache after the prefix.
+    """
+
+    def __init__(self, text_pipeline: TextGenerationPipeline):
+        self.model = text_pipeline.model
+        self.tokenizer = text_pipeline.tokenizer
+        self.prefix_ids = self._encode_prompt(PROMPT_PREFIX)
+        with torch.no_grad():
+            self.prefix_cache = self.model(
+                self.prefix_ids, use_cache=True
+            ).past_key_values
+
+    def _encode_prompt(self, text: str) -> torch.Tensor:
+        return self.tokenizer(text, return_tensors="pt").input_ids.to(self.model.device)
+
+    def _prefix_cache_for(self, input_ids: torch.Tensor) -> Optional[Any]:
+        """Returns a copy of the prefix cache if ``input_ids`` start with the prefix."""
+        n_prefix = self.prefix_ids.shape[1]
+        if input_ids.shape[1] > n_prefix and torch.equal(
+            input_ids[:, :n_prefix], self.prefix_ids
+        ):
+            return copy.deepcopy(self.prefix_cache)
+        return None
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer(text, add_special_tokens=False).input_ids)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cuts ``text`` down to at most ``max_tokens`` tokens."""
+        ids = self.tokenizer(text, add_special_tokens=False).input_ids
+        if len(ids) <= max_tokens:
+            return text
+        return self.tokenizer.decode(ids[:max_tokens], skip_special_tokens=True)
+
+    def stream(
+        self, report_text: str, max_new_tokens: int = 300, do_sample: bool = True
+    ) -> Iterator[str]:
+        """Yields the summary of ``report_text`` piece by piece as it is decoded."""
+        input_ids = self._encode_prompt(format_chat_prompt(report_text))
+        past_key_values = self._prefix_cache_for(input_ids)
+        streamer = TextIteratorStreamer(
+            self.tokenizer, skip_prompt=True, skip_special_tokens=True
+        )
+        errors = []
+
+        def generate():
+            try:
+                self.model.generate(
+                    input_ids=input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    past_key_values=past_key_values,
+                    max_new_tokens=max_new_tokens,
+                    do_sample=do_sample,
+                    streamer=streamer,
+                )
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        thread = Thread(target=generate, daemon=True)
+        thread.start()
+        yield from streamer
+        thread.join()
+        if errors:
+            raise errors[0]
+
+
+# Keyed weakly so a generator (and its cache) goes away with its pipeline
+_generators: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_prefix_generator(
+    text_pipeline: TextGenerationPipeline,
+) -> PrefixCachedGenerator:
+    """Returns the `PrefixCachedGenerator` for ``text_pipeline``, building it once."""
+    generator = _generators.get(text_pipeline)
+    if generator is None:
+        generator = _generators[text_pipeline] = PrefixCachedGenerator(text_pipeline)
+    return generator
+
+
+def _fit_to_budget(
+    generator: PrefixCachedGenerator,
+    lines: List[str],
+    max_prompt_tokens: int,
+    max_new_tokens: int,
+    do_sample: bool,
+) -> str:
+    """
+    Shrinks the report list until it fits in ``max_prompt_tokens``.
+
+    Overlong reports are truncated. If the list is still too long it is split into
+    groups that fit, each group is summarized (map) and the partial summaries take
+    the place of the reports (reduce), repeating until one prompt suffices.
+    """
+    lines = [generator.truncate(line, max_prompt_tokens) for line in lines]
+    while generator.count_tokens("\n".join(lines)) > max_prompt_tokens:
+        groups, group, used = [], [], 0
+        for line in lines:
+            n_tokens = generator.count_tokens(line) + 1
+            if group and used + n_tokens > max_prompt_tokens:
+                groups.append(group)
+                group, used = [], 0
+            group.append(line)
+            used += n_tokens
+        groups.append(group)
+
+        partials = [
+            "".join(
+                generator.stream("\n".join(group), max_new_tokens, do_sample)
+            ).strip()
+            for group in groups
+        ]
+        reduced = [
+            f"- Summary of reports {i + 1} of {len(groups)}: {partial}"
+            for i, partial in enumerate(partials)
+        ]
+        if len(reduced) >= len(lines):
+            return generator.truncate("\n".join(reduced), max_prompt_tokens)
+        lines = reduced
+    return "\n".join(lines)
+
+
+def stream_summary(
+    reports: List[Dict[str, str]],
+    model: Optional[TextGenerationPipeline] = None,
+    do_sample: bool = True,
+    max_new_tokens: int = 300,
+    max_prompt_tokens: int = 1024,
+) -> Iterator[str]:
+    """
+    Yields a summary of ``reports`` as it is generated.
+
+    Parameters
+    ----------
+    reports : list of dict
+        Reports with 'title' and 'summary' fields.
+    model : TextGenerationPipeline, optional
+        Text-generation pipeline. Defaults to SmolLM-360M-Instruct.
+    do_sample : bool
+        Whether to sample rather than decode greedily.
+    max_new_tokens : int
+        Maximum length of the summary.
+    max_prompt_tokens : int
+        Token budget for the report text. Longer report lists are truncated or
+        map-reduced (see `_fit_to_budget`) so prompt size stays bounded.
+
+    Yields
+    ------
+    str
+        Consecutive pieces of the summary text.
+    """
+    if not reports:
+        yield "No reports to summarize."
+        return
+
+    generator = get_prefix_generator(model or get_smollm_chat_pipeline())
+
+    # Concatenate report titles + summaries
+    lines = [f"- {r.get('title', 'Untitled')}: {r.get('summary', '')}" for r in reports]
+    report_text = _fit_to_budget(
+        generator, lines, max_prompt_tokens, max_new_tokens, do_sample
     )
 
+    for text in generator.stream(report_text, max_new_tokens, do_sample):
+        if _stream_handler is not None:
+            _stream_handler(text)
+        yield text
+
 
 @tool
 def summarize_reports(
@@ -42,6 +252,7 @@ def summarize_reports(
     db_path: str = "crisiswatch.db",  # unused
     model: Optional[TextGenerationPipeline] = None,
     do_sample: bool = True,
+    max_prompt_tokens: int = 1024,
 ) -> str:
     """
     description: Generates a high-level summary of CrisisWatch reports using a SmolLM instruction-tuned model.
@@ -51,26 +262,16 @@ def summarize_reports(
         db_path: Unused (placeholder for compatibility).
         model: Optional HuggingFace text-generation pipeline. Defaults to SmolLM-360M-Instruct.
         do_sample: Optional Whether or not to do beam search.
+        max_prompt_tokens: Optional token budget for the report text; longer lists are condensed first.
 
     Returns:
         A markdown-formatted string summarizing the content.
     """
-    if not reports:
-        return "No reports to summarize."
-
-    if model is None:
-        model = get_smollm_chat_pipeline()
-
-    # Concatenate report titles + summaries
-    report_text = "\n".join(
-        f"- {r.get('title', 'Untitled')}: {r.get('summary', '')}" for r in reports
-    )
-
-    # Format for chat-style prompting
-    prompt = format_chat_prompt(report_text)
-
-    # Generate completion
-    output = model(
-        prompt, max_new_tokens=300, do_sample=do_sample, return_full_text=False
-    )
-    return output[0]["generated_text"].strip()
+    return "".join(
+        stream_summary(
+            reports,
+            model=model,
+            do_sample=do_sample,
+            max_prompt_tokens=max_prompt_tokens,
+        )
+    ).strip()